@@ -7,20 +7,43 @@ from dash.exceptions import PreventUpdate
 from dash.dependencies import Input, Output, State
 
 import dash_flexbox_grid as dfx
+import flask
+import plotly
 import plotly.graph_objs as go
 import sd_material_ui as mui
 import json
+import os
+import gzip
+import hmac
+import logging
+import itertools
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # gusset design info
 from gusset_design.elements.gusset_node import GussetNode
-from gusset_design.elements.gusset_plate import GussetPlate
 from gusset_design.visualization.plotly2D import PlotlyLineXY
 
+from design_checks import calculate_dcr
+from design_checks import create_gusset_plate
+from design_checks import plate_geometry
+from session_store import SessionStore
+from gusset_geometry import gusset_feasibility_mask
+from assembly_sections import assembly_section_hashes
+from assembly_sections import changed_sections
+from warmup import default_force
+from warmup import merge_usage
+from warmup import neighbour_assemblies
+from warmup import parse_warmup_entry
+from warmup import write_usage_file
+import figure_encoding
+
 from numpy import tan
 from numpy import sin
 from numpy import cos
 from numpy import radians
-from numpy import abs
 from numpy import sqrt
 
 # Compas classes
@@ -41,6 +64,7 @@ from compas.geometry import Transformation
 
 app = dash.Dash(
     __name__,
+    compress=True,
     meta_tags=[{'name': 'viewport',
                 'content': 'Width=device-width, initial-scale=1'}]
     )
@@ -48,6 +72,30 @@ app = dash.Dash(
 server = app.server
 app.config.suppress_callback_exceptions = True
 
+# per-user state lives here, dcc.Store(id='local') only holds the session key
+session_store = SessionStore.from_environ()
+
+
+# token for /admin/sessions, without one only local requests are served
+admin_token = os.environ.get('GUSSET_ADMIN_TOKEN')
+
+
+@server.route('/admin/sessions')
+def session_footprint():
+    if admin_token:
+        authorization = flask.request.headers.get('Authorization', '')
+        if not hmac.compare_digest(authorization, 'Bearer ' + admin_token):
+            flask.abort(403)
+    elif flask.request.remote_addr not in ('127.0.0.1', '::1'):
+        flask.abort(403)
+    with assembly_cache_lock:
+        cached = dict((path, entry['bytes']) for path, entry in assembly_cache.items())
+    return flask.jsonify({'sessions': session_store.stats(),
+                          'assembly_cache': {'assemblies': len(cached),
+                                             'total_bytes': sum(cached.values()),
+                                             'max_total_bytes': assembly_cache_bytes,
+                                             'by_assembly': cached}})
+
 #  ----------------------------------------------------------------------------
 #  Components
 #  ----------------------------------------------------------------------------
@@ -168,6 +216,20 @@ def build_assembly_input():
                                             ]),
                                     html.Br(),
                                     html.Button('Submit', id='input-button'),
+                                    html.Div(id='session-status',
+                                             style={'font-variant': 'small-caps',
+                                                    'color': 'red'}),
+                                    dcc.Checklist(
+                                        id='assembly-watch',
+                                        options=[{'label': 'Watch file for changes',
+                                                  'value': 'watch'}],
+                                        value=[]
+                                    ),
+                                    dcc.Interval(
+                                        id='assembly-watch-interval',
+                                        interval=2000,
+                                        disabled=True
+                                    ),
                                     ])
                                 ])
 def build_force_input():
@@ -363,6 +425,277 @@ def to_plotly_xy(line):
         gusset_guideline = {'x': [pt0[0], pt1[0]], 'y': [pt0[1], pt1[1]]}
         return gusset_guideline
 
+
+def slider_feasibility_marks(feasible):
+    """Slider marks with the infeasible positions greyed out."""
+    marks = {}
+    for (value, label), ok in zip(slider_marks.items(), feasible):
+        if ok:
+            marks[value] = label
+        else:
+            marks[value] = {'label': label, 'style': {'color': '#cccccc'}}
+    return marks
+
+
+# evaluated assemblies by absolute filepath, shared by all sessions and
+# ordered least recently used first
+assembly_cache = OrderedDict()
+assembly_cache_lock = threading.Lock()
+assembly_locks = {}
+# limit on the encoded figures held by assembly_cache
+assembly_cache_bytes = int(os.environ.get('GUSSET_ASSEMBLY_CACHE_BYTES', 256 * 2 ** 20))
+# brace forces kept per cached assembly
+assembly_force_limit = 16
+# revisions are unique within the process, so an evicted and re-created
+# entry never matches a revision a session already has
+assembly_revisions = itertools.count(1)
+
+# most used assemblies by absolute filepath, {'count': n, 'force': kips}
+assembly_usage_path = os.environ.get('GUSSET_USAGE_FILE', '.gusset_usage.json')
+assembly_usage = {}
+# uses recorded by this process since the usage file was last written
+pending_usage = {}
+usage_lock = threading.Lock()
+usage_file_lock = threading.Lock()
+# background evaluation of warm-up and neighbouring assemblies
+prefetch_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('GUSSET_PREFETCH_WORKERS', 2)))
+prefetch_limit = int(os.environ.get('GUSSET_PREFETCH_LIMIT', 4))
+
+
+def calculate_gusset_data(gusset, force_value):
+    V_c, H_c, M_c, V_b, H_b, M_b = gusset.calculate_interface_forces(force_value)
+    gusset_dict = dict(plate_geometry(gusset),
+                       V_c=V_c,
+                       H_c=H_c,
+                       M_c=M_c,
+                       V_b=V_b,
+                       H_b=H_b,
+                       M_b=M_b)
+    return gusset_dict
+
+
+def encode_figure(figure, name='figure'):
+    """Encoded figure and its estimated size, see figure_encoding.
+
+    Actual encoded and gzipped sizes are logged at debug level.
+    """
+    if isinstance(figure, go.Figure):
+        figure = figure.to_plotly_json()
+    encoded, size = figure_encoding.encode_figure(figure)
+    if server.logger.isEnabledFor(logging.DEBUG):
+        text = json.dumps(encoded, cls=plotly.utils.PlotlyJSONEncoder).encode()
+        server.logger.debug('%s encoded: %d bytes (estimated %d), %d bytes gzipped', name,
+                            len(text), size, len(gzip.compress(text)))
+    return encoded, size
+
+
+def create_assembly_figure(gusset_node):
+    meshes = gusset_node.to_meshes()
+    fig = go.Figure(data=meshes)
+    fig.update_layout(scene_aspectmode='data',
+                      height=620,
+                      margin=dict(l=10, t=10, b=10))
+    return encode_figure(fig, name='3D assembly')
+
+
+def update_assembly_entry(filepath, entry):
+    """Re-read an assembly file if it changed on disk since entry was made.
+
+    The 3D figure is rebuilt when any member changed and the GussetPlate
+    only when a change can affect it (see changed_sections); brace force
+    results are kept
+    otherwise. Returns entry itself when nothing changed, else a new entry
+    with a new revision.
+    """
+    mtime = os.path.getmtime(filepath)
+    if entry is not None and entry['mtime'] == mtime:
+        return entry
+    sections = assembly_section_hashes(filepath)
+    if entry is not None:
+        changed, gusset_changed = changed_sections(entry['sections'], sections)
+        if not changed:
+            return dict(entry, mtime=mtime)
+    gusset_node = GussetNode.from_json(filepath)
+    figure, figure_bytes = create_assembly_figure(gusset_node)
+    updated = {'mtime': mtime,
+               'sections': sections,
+               'figure': figure,
+               'bytes': figure_bytes,
+               'revision': next(assembly_revisions)}
+    if entry is None or gusset_changed:
+        updated.update({'gusset': create_gusset_plate(gusset_node), 'forces': OrderedDict()})
+    else:
+        updated.update({'gusset': entry['gusset'], 'forces': entry['forces']})
+    return updated
+
+
+def cache_assembly_entry(filepath, entry):
+    """Store entry as most recently used and evict past assembly_cache_bytes."""
+    with assembly_cache_lock:
+        assembly_cache[filepath] = entry
+        assembly_cache.move_to_end(filepath)
+        total = sum(cached['bytes'] for cached in assembly_cache.values())
+        while total > assembly_cache_bytes and len(assembly_cache) > 1:
+            _, evicted = assembly_cache.popitem(last=False)
+            total -= evicted['bytes']
+
+
+def evaluate_gusset_assembly(filepath, force_value):
+    """Evaluate an assembly file, reusing whatever is unchanged since last time.
+
+    Returns the file's cache entry and the gusset data for force_value. The
+    entry's revision only changes when the file does, so sessions watching
+    the same file with different brace forces do not disturb each other.
+    """
+    filepath = os.path.abspath(filepath)
+    with assembly_cache_lock:
+        lock = assembly_locks.setdefault(filepath, threading.Lock())
+    with lock:
+        entry = update_assembly_entry(filepath, assembly_cache.get(filepath))
+        forces = entry['forces']
+        data = forces.get(force_value)
+        if data is not None:
+            forces.move_to_end(force_value)
+        else:
+            data = calculate_gusset_data(entry['gusset'], force_value)
+            forces[force_value] = data
+            while len(forces) > assembly_force_limit:
+                forces.popitem(last=False)
+        cache_assembly_entry(filepath, entry)
+        return entry, data
+
+
+def read_usage_file():
+    try:
+        with open(assembly_usage_path) as fp:
+            return json.load(fp)
+    except OSError:
+        return {}
+    except ValueError:
+        server.logger.warning('Ignoring unreadable assembly usage file %s', assembly_usage_path)
+        return {}
+
+
+def load_assembly_usage():
+    global assembly_usage
+    assembly_usage = read_usage_file()
+
+
+def save_assembly_usage():
+    """Merge this process's pending uses into the usage file.
+
+    The file is re-read so counts from other worker processes are kept, and
+    replaced atomically.
+    """
+    global assembly_usage
+    with usage_file_lock:
+        with usage_lock:
+            pending = dict(pending_usage)
+            pending_usage.clear()
+        if not pending:
+            return
+        usage = merge_usage(read_usage_file(), pending)
+        try:
+            write_usage_file(assembly_usage_path, usage)
+        except OSError:
+            server.logger.warning('Could not save assembly usage to %s', assembly_usage_path)
+            with usage_lock:
+                for filepath, used in pending.items():
+                    retry = pending_usage.setdefault(filepath, {'count': 0})
+                    retry['count'] += used['count']
+                    retry.setdefault('force', used['force'])
+            return
+        assembly_usage = usage
+
+
+def record_assembly_use(filepath, force_value):
+    with usage_lock:
+        used = pending_usage.setdefault(filepath, {'count': 0})
+        used['count'] += 1
+        used['force'] = force_value
+    prefetch_executor.submit(save_assembly_usage)
+
+
+def prefetch_assembly(filepath, force_value):
+    """Evaluate an assembly in the background unless it is already cached."""
+    if filepath in assembly_cache:
+        return
+
+    def evaluate():
+        try:
+            evaluate_gusset_assembly(filepath, force_value)
+        except Exception:
+            server.logger.debug('Prefetch of %s failed', filepath, exc_info=True)
+
+    prefetch_executor.submit(evaluate)
+
+
+def prefetch_neighbours(filepath, force_value):
+    """Prefetch the assemblies next to filepath in its project directory."""
+    prefetched = 0
+    for path in neighbour_assemblies(filepath):
+        if prefetched == prefetch_limit:
+            break
+        if path not in assembly_cache:
+            prefetch_assembly(path, force_value)
+            prefetched += 1
+
+
+def warm_up_assemblies():
+    """Preload GUSSET_WARMUP assemblies and the most used ones in the background.
+
+    GUSSET_WARMUP is a list of assembly files separated like PATH, each
+    optionally followed by @force (e.g. assembly.json@400).
+    GUSSET_WARMUP_TOP sets how many of the most used assemblies are added.
+    """
+    load_assembly_usage()
+    warmup = []
+    for item in os.environ.get('GUSSET_WARMUP', '').split(os.pathsep):
+        if not item:
+            continue
+        try:
+            warmup.append(parse_warmup_entry(item))
+        except ValueError:
+            server.logger.warning('Skipping invalid GUSSET_WARMUP entry %r', item)
+    top = int(os.environ.get('GUSSET_WARMUP_TOP', 5))
+    most_used = sorted(assembly_usage.items(), key=lambda item: -item[1]['count'])[:top]
+    warmup.extend((filepath, usage.get('force', default_force)) for filepath, usage in most_used)
+    for filepath, force_value in warmup:
+        prefetch_assembly(filepath, force_value)
+
+
+# shown when the key in dcc.Store(id='local') no longer has server-side state
+session_expired_message = 'Session expired, submit the assembly again'
+
+
+def get_session_data(local):
+    """Server-side state for the key held in dcc.Store(id='local')."""
+    data = session_store.get(local.get('session'))
+    if data is None:
+        # expired or evicted, the assembly has to be submitted again
+        raise PreventUpdate
+    return data
+
+
+def interface_dcr_indicator(data, interface, check, l1, l2, thickness):
+    """Indicator color and label; infeasible outlines are not checked."""
+    if not gusset_feasibility_mask(l1, l2, data):
+        return '#cccccc', 'infeasible'
+    length = l1 if interface == 'beam' else l2
+    return dcr_indicator(calculate_dcr(data, interface, check, length, thickness))
+
+
+def dcr_indicator(dcr):
+    if dcr > 0.95:
+        color = 'red'
+    elif dcr > 0.85:
+        color = 'yellow'
+    else:
+        color = 'green'
+    return color, "{:.0%}".format(dcr)
+
+
 #  ----------------------------------------------------------------------------
 #  Layout
 #  ----------------------------------------------------------------------------
@@ -407,45 +740,81 @@ def update_l2_textbox_value(input_value):
     return 'L2 = {} inches'.format(input_value)
 
 
+@app.callback(
+    Output('assembly-watch-interval', 'disabled'),
+    [Input('assembly-watch', 'value')]
+)
+def toggle_assembly_watch(watch):
+    return 'watch' not in (watch or [])
+
+
 @app.callback(
     [Output(component_id='connection-3d-visualization', component_property='figure'),
      Output('local', 'data')],
-    [Input('input-button', 'n_clicks')],
+    [Input('input-button', 'n_clicks'),
+     Input('assembly-watch-interval', 'n_intervals')],
     [State('assembly-input-field', 'value'),
-     State('force-input-field', 'value')]
+     State('force-input-field', 'value'),
+     State('local', 'data')]
 )
-def load_gusset_assembly(n_clicks, filepath, force_value):
+def load_gusset_assembly(n_clicks, n_intervals, filepath, force_value, local):
     if n_clicks is None:
         raise PreventUpdate
     elif filepath is None:
         raise PreventUpdate
     elif force_value is None:
         raise PreventUpdate
+    filepath = os.path.abspath(filepath)
+    session = local.get('session') if local is not None else None
+    data = session_store.get(session) if session is not None else None
+    triggered = [t['prop_id'] for t in dash.callback_context.triggered]
+    if 'assembly-watch-interval.n_intervals' in triggered:
+        # re-evaluate what this session last submitted, not the input fields
+        if data is None:
+            raise PreventUpdate
+        filepath, force_value = data['filepath'], data['force']
+        try:
+            entry, gusset_data = evaluate_gusset_assembly(filepath, force_value)
+        except Exception:
+            # file missing, mid-write or not a complete assembly yet, try
+            # again on the next tick
+            server.logger.warning('Could not re-evaluate %s', filepath, exc_info=True)
+            raise PreventUpdate
+        if data.get('revision') == entry['revision']:
+            raise PreventUpdate
     else:
-        gusset_node = GussetNode.from_json(filepath)
-        # TODO: Add handling for non Q1 gussets - (need to create workplane given beam/column/brace)
-        # Gusset angle needs to be passed some other way
-        brace = gusset_node.braces[0]
-        gusset = GussetPlate(gusset_node.braces[0], gusset_node.column[0],
-                             gusset_node.beams[0], 'i', brace_angle=brace.brace_angle)
-        V_c, H_c, M_c, V_b, H_b, M_b = gusset.calculate_interface_forces(force_value)
-        gusset_dict = {'eb': gusset.eb, 'ec': gusset.ec,
-                       'offset': gusset.offset,
-                       'design_angle': gusset.design_angle,
-                       'brace_depth': gusset.get_brace_depth(),
-                       'connection_length': gusset.connection_length,
-                       'V_c': V_c,
-                       'H_c': H_c,
-                       'M_c': M_c,
-                       'V_b': V_b,
-                       'H_b': H_b,
-                       'M_b': M_b}
-        meshes = gusset_node.to_meshes()
-        fig = go.Figure(data=meshes)
-        fig.update_layout(scene_aspectmode='data',
-                          height=620,
-                          margin=dict(l=10, t=10, b=10))
-        return fig, gusset_dict
+        entry, gusset_data = evaluate_gusset_assembly(filepath, force_value)
+        record_assembly_use(filepath, force_value)
+        prefetch_neighbours(filepath, force_value)
+    if data is None:
+        session = session_store.create()
+    figure = entry['figure']
+    if data is not None and data.get('filepath') == filepath and \
+            data.get('revision') == entry['revision']:
+        # the browser already has this figure, skip encoding it again
+        figure = dash.no_update
+    gusset_dict = dict(gusset_data, filepath=filepath, force=force_value,
+                       revision=entry['revision'])
+    version = session_store.set(session, gusset_dict)
+    return figure, {'session': session, 'version': version}
+
+
+@app.callback(
+    Output('session-status', 'children'),
+    [Input('local', 'modified_timestamp'),
+     Input('l1-slider', 'value'),
+     Input('l2-slider', 'value'),
+     Input('gusset-thickness', 'value'),
+     Input('assembly-watch-interval', 'n_intervals')],
+    [State('local', 'data')]
+)
+def update_session_status(ts, l1, l2, thickness, n_intervals, local):
+    # the plot and DCR callbacks cannot update without a session, so say why
+    if local is None or local.get('session') is None:
+        return ''
+    if session_store.get(local['session']) is None:
+        return session_expired_message
+    return ''
 
 
 @app.callback(
@@ -460,7 +829,7 @@ def update_2d_plot(l1, l2, ts, gusset_data):
         raise PreventUpdate
     if gusset_data is None:
         raise PreventUpdate
-    data = gusset_data or {}
+    data = get_session_data(gusset_data)
     gusset_lines = []
     work_point = [0, 0, 0]
     pt0 = list(Point(data['eb'], data['ec']))
@@ -532,8 +901,9 @@ def update_2d_plot(l1, l2, ts, gusset_data):
         pt3 = beam_line[0]
         pt4 = beam_line[1]
 
-    # set check to make sure gusset is non concave (force points to line
-    # between pt2 and pt5)
+    # check that the gusset is non concave (pt3/pt4 outside the line between
+    # pt2 and pt5), non self-intersecting and has no degenerate edges
+    feasible = bool(gusset_feasibility_mask(l1, l2, data))
     # Points list to point
     pt0 = Point(pt0[0], pt0[1], pt0[2])
     pt1 = Point(pt1[0], pt1[1], pt1[2])
@@ -552,7 +922,10 @@ def update_2d_plot(l1, l2, ts, gusset_data):
         y.append(pt[1])
     gusset_outline = {'x': x, 'y': y}
     print(gusset_outline)
-    plotly_styled = PlotlyLineXY.from_geometry(gusset_outline)
+    if feasible:
+        plotly_styled = PlotlyLineXY.from_geometry(gusset_outline)
+    else:
+        plotly_styled = PlotlyLineXY.from_geometry(gusset_outline, line={'color': 'red'})
     gusset_lines_styled = [plotly_styled]
     for line in gusset_lines:
         line_formatted = to_plotly_xy(line)
@@ -566,7 +939,27 @@ def update_2d_plot(l1, l2, ts, gusset_data):
                          margin=dict(l=10, t=10, b=10))
     figure.update_xaxes(range=[0, 80], showgrid=False, zeroline=False, showticklabels=False)
     figure.update_yaxes(range=[0, 80], showgrid=False, zeroline=False, showticklabels=False)
-    return figure
+    return encode_figure(figure, name='2D gusset')[0]
+
+
+@app.callback(
+    [Output('l1-slider', 'marks'),
+     Output('l2-slider', 'marks')],
+    [Input('l1-slider', 'value'),
+     Input('l2-slider', 'value'),
+     Input('local', 'modified_timestamp')],
+    [State('local', 'data')]
+)
+def update_slider_feasibility(l1, l2, ts, data):
+    if ts is None:
+        raise PreventUpdate
+    if data is None:
+        raise PreventUpdate
+    data = get_session_data(data)
+    mark_values = list(slider_marks)
+    l1_feasible = gusset_feasibility_mask(mark_values, l2, data)
+    l2_feasible = gusset_feasibility_mask(l1, mark_values, data)
+    return slider_feasibility_marks(l1_feasible), slider_feasibility_marks(l2_feasible)
 
 #  ----------------------------------------------------------------------------
 #  Calculator Callbacks
@@ -577,215 +970,150 @@ def update_2d_plot(l1, l2, ts, gusset_data):
     [Output('beam-axial-tension-indicator', 'color'),
      Output('beam-axial-tension-circle-value', 'children')],
     [Input('l1-slider', 'value'),
+     Input('l2-slider', 'value'),
      Input('gusset-thickness', 'value'),
      Input('local', 'modified_timestamp')],
     [State('local', 'data')]
     )
-def get_l1_axial_tension_dcr(l1, thickness, ts, data):
+def get_l1_axial_tension_dcr(l1, l2, thickness, ts, data):
     if ts is None:
         raise PreventUpdate
     if data is None:
         raise PreventUpdate
-    p_u = data['V_b']
-    phi_Pn = 0.9 * 50 * l1 * thickness
-    at_dcr = p_u / phi_Pn
-    if at_dcr > 0.95:
-        color = 'red'
-    elif at_dcr > 0.85:
-        color = 'yellow'
-    else:
-        color = 'green'
-    return color, "{:.0%}".format(at_dcr)
+    data = get_session_data(data)
+    return interface_dcr_indicator(data, 'beam', 'axial-tension', l1, l2, thickness)
 
 
 @app.callback(
     [Output('column-axial-tension-indicator', 'color'),
      Output('column-axial-tension-circle-value', 'children')],
-    [Input('l2-slider', 'value'),
+    [Input('l1-slider', 'value'),
+     Input('l2-slider', 'value'),
      Input('gusset-thickness', 'value'),
      Input('local', 'modified_timestamp')],
     [State('local', 'data')]
     )
-def get_l2_axial_tension_dcr(l2, thickness, ts, data):
+def get_l2_axial_tension_dcr(l1, l2, thickness, ts, data):
     if ts is None:
         raise PreventUpdate
     if data is None:
         raise PreventUpdate
-    p_u = data['H_c']
-    phi_Pn = 0.9 * 50 * l2 * thickness
-    at_dcr = p_u / phi_Pn
-    if at_dcr > 0.95:
-        color = 'red'
-    elif at_dcr > 0.85:
-        color = 'yellow'
-    else:
-        color = 'green'
-    return color, "{:.0%}".format(at_dcr)
+    data = get_session_data(data)
+    return interface_dcr_indicator(data, 'column', 'axial-tension', l1, l2, thickness)
 
 
 @app.callback(
     [Output('beam-moment-indicator', 'color'),
      Output('beam-moment-circle-value', 'children')],
     [Input('l1-slider', 'value'),
+     Input('l2-slider', 'value'),
      Input('gusset-thickness', 'value'),
      Input('local', 'modified_timestamp')],
     [State('local', 'data')]
     )
-def get_l1_moment_dcr(l1, thickness, ts, data):
+def get_l1_moment_dcr(l1, l2, thickness, ts, data):
     if ts is None:
         raise PreventUpdate
     if data is None:
         raise PreventUpdate
-    m_u = data['M_b']
-    Z_gusset = thickness * l1 ** 2.0 / 4
-    phi_Mn = 0.9 * 50 * Z_gusset
-    m_dcr = abs(m_u) / phi_Mn
-    if m_dcr > 0.95:
-        color = 'red'
-    elif m_dcr > 0.85:
-        color = 'yellow'
-    else:
-        color = 'green'
-    return color, "{:.0%}".format(m_dcr)
+    data = get_session_data(data)
+    return interface_dcr_indicator(data, 'beam', 'moment', l1, l2, thickness)
 
 
 @app.callback(
     [Output('column-moment-indicator', 'color'),
      Output('column-moment-circle-value', 'children')],
-    [Input('l2-slider', 'value'),
+    [Input('l1-slider', 'value'),
+     Input('l2-slider', 'value'),
      Input('gusset-thickness', 'value'),
      Input('local', 'modified_timestamp')],
     [State('local', 'data')]
     )
-def get_l2_moment_dcr(l2, thickness, ts, data):
+def get_l2_moment_dcr(l1, l2, thickness, ts, data):
     if ts is None:
         raise PreventUpdate
     if data is None:
         raise PreventUpdate
-    m_u = data['M_c']
-    Z_gusset = thickness * l2 ** 2.0 / 4
-    phi_Mn = 0.9 * 50 * Z_gusset
-    m_dcr = abs(m_u) / phi_Mn
-    if m_dcr > 0.95:
-        color = 'red'
-    elif m_dcr > 0.85:
-        color = 'yellow'
-    else:
-        color = 'green'
-    return color, "{:.0%}".format(m_dcr)
+    data = get_session_data(data)
+    return interface_dcr_indicator(data, 'column', 'moment', l1, l2, thickness)
 
 
 @app.callback(
     [Output('beam-shear-indicator', 'color'),
      Output('beam-shear-circle-value', 'children')],
     [Input('l1-slider', 'value'),
+     Input('l2-slider', 'value'),
      Input('gusset-thickness', 'value'),
      Input('local', 'modified_timestamp')],
     [State('local', 'data')]
     )
-def get_l1_in_plane_shear_dcr(l1, thickness, ts, data):
+def get_l1_in_plane_shear_dcr(l1, l2, thickness, ts, data):
     if ts is None:
         raise PreventUpdate
     if data is None:
         raise PreventUpdate
-    v_u = data['H_b']
-    A_gusset = thickness * l1
-    phi_Vn = 0.9 * 50 * A_gusset * 0.6
-    v_dcr = abs(v_u) / phi_Vn
-    if v_dcr > 0.95:
-        color = 'red'
-    elif v_dcr > 0.85:
-        color = 'yellow'
-    else:
-        color = 'green'
-    return color, "{:.0%}".format(v_dcr)
+    data = get_session_data(data)
+    return interface_dcr_indicator(data, 'beam', 'shear', l1, l2, thickness)
 
 
 @app.callback(
     [Output('column-shear-indicator', 'color'),
      Output('column-shear-circle-value', 'children')],
-    [Input('l2-slider', 'value'),
+    [Input('l1-slider', 'value'),
+     Input('l2-slider', 'value'),
      Input('gusset-thickness', 'value'),
      Input('local', 'modified_timestamp')],
     [State('local', 'data')]
     )
-def get_l2_in_plane_shear_dcr(l2, thickness, ts, data):
+def get_l2_in_plane_shear_dcr(l1, l2, thickness, ts, data):
     if ts is None:
         raise PreventUpdate
     if data is None:
         raise PreventUpdate
-    v_u = data['V_c']
-    A_gusset = thickness * l2
-    phi_Vn = 0.9 * 50 * A_gusset * 0.6
-    v_dcr = abs(v_u) / phi_Vn
-    if v_dcr > 0.95:
-        color = 'red'
-    elif v_dcr > 0.85:
-        color = 'yellow'
-    else:
-        color = 'green'
-    return color, "{:.0%}".format(v_dcr)
+    data = get_session_data(data)
+    return interface_dcr_indicator(data, 'column', 'shear', l1, l2, thickness)
 
 
 @app.callback(
     [Output('beam-Von-Mises-indicator', 'color'),
      Output('beam-Von-Mises-circle-value', 'children')],
     [Input('l1-slider', 'value'),
+     Input('l2-slider', 'value'),
      Input('gusset-thickness', 'value'),
      Input('local', 'modified_timestamp')],
     [State('local', 'data')]
     )
-def get_l1_von_mises_dcr(l1, thickness, ts, data):
+def get_l1_von_mises_dcr(l1, l2, thickness, ts, data):
     if ts is None:
         raise PreventUpdate
     if data is None:
         raise PreventUpdate
-    p_u = data['V_b']
-    v_u = data['H_b']
-    A_gusset = thickness * l1
-    sigma_p = p_u / A_gusset
-    sigma_v = v_u / A_gusset
-    sigma_vm = (sigma_p ** 2.0 + sigma_v ** 2.0) ** 0.5
-    phi_vm = 0.9 * 50.
-    vm_dcr = sigma_vm / phi_vm
-    if vm_dcr > 0.95:
-        color = 'red'
-    elif vm_dcr > 0.85:
-        color = 'yellow'
-    else:
-        color = 'green'
-    return color, "{:.0%}".format(vm_dcr)
+    data = get_session_data(data)
+    return interface_dcr_indicator(data, 'beam', 'Von-Mises', l1, l2, thickness)
 
 
 @app.callback(
     [Output('column-Von-Mises-indicator', 'color'),
      Output('column-Von-Mises-circle-value', 'children')],
-    [Input('l2-slider', 'value'),
+    [Input('l1-slider', 'value'),
+     Input('l2-slider', 'value'),
      Input('gusset-thickness', 'value'),
      Input('local', 'modified_timestamp')],
     [State('local', 'data')]
     )
-def get_l2_von_mises_dcr(l2, thickness, ts, data):
+def get_l2_von_mises_dcr(l1, l2, thickness, ts, data):
     if ts is None:
         raise PreventUpdate
     if data is None:
         raise PreventUpdate
-    p_u = data['H_c']
-    v_u = data['V_c']
-    A_gusset = thickness * l2
-    sigma_p = p_u / A_gusset
-    sigma_v = v_u / A_gusset
-    sigma_vm = (sigma_p ** 2.0 + sigma_v ** 2.0) ** 0.5
-    phi_vm = 0.9 * 50.
-    vm_dcr = sigma_vm / phi_vm
-    if vm_dcr > 0.95:
-        color = 'red'
-    elif vm_dcr > 0.85:
-        color = 'yellow'
-    else:
-        color = 'green'
-    return color, "{:.0%}".format(vm_dcr)
+    data = get_session_data(data)
+    return interface_dcr_indicator(data, 'column', 'Von-Mises', l1, l2, thickness)
 
 
 if __name__ == '__main__':
-    app.run_server(debug=True, port=8050)
+    debug = True
+    # the reloader imports this module in a watcher process as well as the
+    # one serving requests, only the latter sets WERKZEUG_RUN_MAIN
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warm_up_assemblies()
+    app.run_server(debug=debug, port=8050)
@@ -0,0 +1,48 @@
+"""Per-member hashes of assembly files, used to localize edits on reload."""
+import hashlib
+import json
+
+# sections of the assembly file that feed GussetPlate
+gusset_sections = ['braces[0]', 'column[0]', 'beams[0]']
+
+
+def assembly_section_hashes(filepath):
+    """Hash every member of an assembly file so edits can be localized.
+
+    List-valued entries are hashed per item (e.g. 'beams[1]') along with
+    their length ('beams[]'), everything else per top-level key.
+    """
+    with open(filepath) as fp:
+        assembly = json.load(fp)
+
+    def digest(value):
+        return hashlib.sha1(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+    if not isinstance(assembly, dict):
+        return {'': digest(assembly)}
+    hashes = {}
+    for key, value in assembly.items():
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                hashes['{}[{}]'.format(key, i)] = digest(item)
+            hashes['{}[]'.format(key)] = str(len(value))
+        else:
+            hashes[key] = digest(value)
+    return hashes
+
+
+def changed_sections(old, new):
+    """Changed section keys between two hashings, and whether the gusset is affected.
+
+    Only edits to members other than the gusset_sections are assumed to
+    leave the GussetPlate alone. Any other change, including to a
+    non-member key or to a file without the expected members, affects it.
+    """
+    keys = set(old) | set(new)
+    changed = set(key for key in keys if old.get(key) != new.get(key))
+    if not set(gusset_sections) & set(new):
+        # unknown layout
+        return changed, bool(changed)
+    members = set(key for key in changed if '[' in key)
+    gusset_changed = bool(changed - members) or bool(changed & set(gusset_sections))
+    return changed, gusset_changed
@@ -0,0 +1,306 @@
+"""Gusset interface design checks and precomputed design lookup tables.
+
+A design table holds every DCR for one assembly over a grid of interface
+length, plate thickness and brace force. It is written as a .npy array that
+is opened memory-mapped, next to a small json index describing the axes, so
+any number of processes can share one copy on disk.
+
+    python design_checks.py path/to/assembly.json --force 100 800 25
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+
+from numpy import abs
+from numpy import arange
+from numpy import asarray
+from numpy import broadcast_arrays
+from numpy import clip
+from numpy import float64
+from numpy import load
+from numpy import nan
+from numpy import where
+from numpy import meshgrid
+from numpy import searchsorted
+from numpy import zeros
+from numpy.lib.format import open_memmap
+
+from gusset_geometry import gusset_feasibility_mask
+
+interfaces = ['beam', 'column']
+checks = ['axial-tension', 'moment', 'shear', 'Von-Mises']
+
+# interface force keys for (axial, moment, shear) demand
+interface_forces = {'beam': ('V_b', 'M_b', 'H_b'),
+                    'column': ('H_c', 'M_c', 'V_c')}
+
+# every check is proportional to 1 / (thickness * length ** n)
+length_exponents = {'axial-tension': 1., 'moment': 2., 'shear': 1., 'Von-Mises': 1.}
+
+# default table axes, matching the app sliders and thickness input
+default_lengths = arange(12, 40.5, 0.5)
+default_thicknesses = arange(0.5, 4.25, 0.25)
+
+
+def create_gusset_plate(gusset_node):
+    from gusset_design.elements.gusset_plate import GussetPlate
+
+    # TODO: Add handling for non Q1 gussets - (need to create workplane given beam/column/brace)
+    # Gusset angle needs to be passed some other way
+    brace = gusset_node.braces[0]
+    return GussetPlate(gusset_node.braces[0], gusset_node.column[0],
+                       gusset_node.beams[0], 'i', brace_angle=brace.brace_angle)
+
+
+def plate_geometry(gusset):
+    """Outline parameters of a GussetPlate, as used by gusset_geometry."""
+    return {'eb': gusset.eb, 'ec': gusset.ec,
+            'offset': gusset.offset,
+            'design_angle': gusset.design_angle,
+            'brace_depth': gusset.get_brace_depth(),
+            'connection_length': gusset.connection_length}
+
+
+def axial_tension_dcr(p_u, length, thickness):
+    phi_Pn = 0.9 * 50 * length * thickness
+    return p_u / phi_Pn
+
+
+def moment_dcr(m_u, length, thickness):
+    Z_gusset = thickness * length ** 2.0 / 4
+    phi_Mn = 0.9 * 50 * Z_gusset
+    return abs(m_u) / phi_Mn
+
+
+def shear_dcr(v_u, length, thickness):
+    A_gusset = thickness * length
+    phi_Vn = 0.9 * 50 * A_gusset * 0.6
+    return abs(v_u) / phi_Vn
+
+
+def von_mises_dcr(p_u, v_u, length, thickness):
+    A_gusset = thickness * length
+    sigma_p = p_u / A_gusset
+    sigma_v = v_u / A_gusset
+    sigma_vm = (sigma_p ** 2.0 + sigma_v ** 2.0) ** 0.5
+    phi_vm = 0.9 * 50.
+    return sigma_vm / phi_vm
+
+
+def calculate_dcr(forces, interface, check, length, thickness):
+    """DCR of one check at an interface; length and thickness may be arrays."""
+    p_key, m_key, v_key = interface_forces[interface]
+    if check == 'axial-tension':
+        return axial_tension_dcr(forces[p_key], length, thickness)
+    elif check == 'moment':
+        return moment_dcr(forces[m_key], length, thickness)
+    elif check == 'shear':
+        return shear_dcr(forces[v_key], length, thickness)
+    elif check == 'Von-Mises':
+        return von_mises_dcr(forces[p_key], forces[v_key], length, thickness)
+    raise ValueError('Unknown design check: {}'.format(check))
+
+
+def file_sha1(filepath):
+    with open(filepath, 'rb') as fp:
+        return hashlib.sha1(fp.read()).hexdigest()
+
+
+def design_table_paths(assembly_path):
+    root = os.path.splitext(assembly_path)[0]
+    return root + '.dcr.npy', root + '.dcr.json'
+
+
+def build_design_table(assembly_path, forces, lengths=default_lengths,
+                       thicknesses=default_thicknesses):
+    """Precompute every DCR of an assembly and write it next to the file.
+
+    The array has shape (interface, check, length, thickness, force); beam
+    checks depend on L1 and column checks on L2 only, so a single length
+    axis covers the full (L1, L2, thickness, force) space.
+    """
+    from gusset_design.elements.gusset_node import GussetNode
+
+    gusset = create_gusset_plate(GussetNode.from_json(assembly_path))
+    return write_design_table(assembly_path, gusset, forces, lengths, thicknesses)
+
+
+def write_design_table(assembly_path, gusset, forces, lengths, thicknesses):
+    """Tabulate the DCRs of a GussetPlate and write them next to assembly_path.
+
+    Both files are written to temporary files and then moved into place, data
+    first, so a DesignTable still mapping the previous table keeps reading it
+    and a new one never sees the new index with the old data.
+    """
+    data_path, index_path = design_table_paths(assembly_path)
+    lengths = asarray(lengths, dtype=float64)
+    thicknesses = asarray(thicknesses, dtype=float64)
+    forces = asarray(forces, dtype=float64)
+    for axis in (lengths, thicknesses, forces):
+        if len(axis) < 2:
+            raise ValueError('Design table axes need at least two values')
+    shape = (len(interfaces), len(checks), len(lengths), len(thicknesses), len(forces))
+    directory = os.path.dirname(os.path.abspath(data_path))
+    fd, tmp_data_path = tempfile.mkstemp(suffix='.npy', dir=directory)
+    os.close(fd)
+    try:
+        table = open_memmap(tmp_data_path, mode='w+', dtype=float64, shape=shape)
+        length_grid, thickness_grid = meshgrid(lengths, thicknesses, indexing='ij')
+        for k, force in enumerate(forces):
+            V_c, H_c, M_c, V_b, H_b, M_b = gusset.calculate_interface_forces(float(force))
+            interface_values = {'V_c': V_c, 'H_c': H_c, 'M_c': M_c,
+                                'V_b': V_b, 'H_b': H_b, 'M_b': M_b}
+            for i, interface in enumerate(interfaces):
+                for j, check in enumerate(checks):
+                    table[i, j, :, :, k] = calculate_dcr(interface_values, interface, check,
+                                                         length_grid, thickness_grid)
+        table.flush()
+        del table
+        index = {'assembly': os.path.basename(assembly_path),
+                 'sha1': file_sha1(assembly_path),
+                 'data': os.path.basename(data_path),
+                 'interfaces': interfaces,
+                 'checks': checks,
+                 'geometry': plate_geometry(gusset),
+                 'lengths': lengths.tolist(),
+                 'thicknesses': thicknesses.tolist(),
+                 'forces': forces.tolist()}
+        fd, tmp_index_path = tempfile.mkstemp(suffix='.json', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as fp:
+                json.dump(index, fp, indent=2)
+            os.replace(tmp_data_path, data_path)
+            os.replace(tmp_index_path, index_path)
+        except BaseException:
+            if os.path.exists(tmp_index_path):
+                os.remove(tmp_index_path)
+            raise
+    finally:
+        if os.path.exists(tmp_data_path):
+            os.remove(tmp_data_path)
+    return index_path
+
+
+def design_table_mtime(assembly_path):
+    """Modification time of an assembly's table index, or None without one."""
+    try:
+        return os.path.getmtime(design_table_paths(assembly_path)[1])
+    except OSError:
+        return None
+
+
+def _axis_weights(axis, values):
+    """Lower grid index and interpolation weight of each value on an axis."""
+    i = clip(searchsorted(axis, values, side='right') - 1, 0, len(axis) - 2)
+    w = (values - axis[i]) / (axis[i + 1] - axis[i])
+    return i, w
+
+
+class DesignTable(object):
+    """Read-only, memory-mapped view of a table written by build_design_table."""
+
+    def __init__(self, index_path):
+        with open(index_path) as fp:
+            self.index = json.load(fp)
+        data_path = os.path.join(os.path.dirname(index_path), self.index['data'])
+        self.table = load(data_path, mmap_mode='r')
+        self.lengths = asarray(self.index['lengths'])
+        self.thicknesses = asarray(self.index['thicknesses'])
+        self.forces = asarray(self.index['forces'])
+
+    @classmethod
+    def for_assembly(cls, assembly_path):
+        """Table for an assembly file, or None if missing or out of date."""
+        data_path, index_path = design_table_paths(assembly_path)
+        if not (os.path.exists(data_path) and os.path.exists(index_path)):
+            return None
+        table = cls(index_path)
+        if table.index['sha1'] != file_sha1(assembly_path):
+            return None
+        return table
+
+    def covers(self, length, thickness, force):
+        """True where a query lies inside the table (no extrapolation)."""
+        length, thickness, force = broadcast_arrays(length, thickness, force)
+        inside = True
+        for axis, values in ((self.lengths, length), (self.thicknesses, thickness),
+                             (self.forces, force)):
+            inside = inside & (values >= axis[0]) & (values <= axis[-1])
+        return inside
+
+    def lookup(self, interface, check, length, thickness, force):
+        """Interpolated DCR; all queries may be arrays.
+
+        Interpolation runs over DCR * thickness * length ** n, which does not
+        depend on thickness or length, so only the force axis is approximate
+        (and exact for interface forces linear in the brace force).
+        """
+        length, thickness, force = broadcast_arrays(asarray(length, dtype=float64),
+                                                    asarray(thickness, dtype=float64),
+                                                    asarray(force, dtype=float64))
+        grid = self.table[interfaces.index(interface), checks.index(check)]
+        n = length_exponents[check]
+        axes = (self.lengths, self.thicknesses, self.forces)
+        weights = [_axis_weights(axis, values) for axis, values in
+                   zip(axes, (length, thickness, force))]
+        scaled = zeros(length.shape)
+        for corner in range(8):
+            corner_weight = 1.
+            corner_index = []
+            for bit, (i, w) in enumerate(weights):
+                if corner >> bit & 1:
+                    corner_index.append(i + 1)
+                    corner_weight = corner_weight * w
+                else:
+                    corner_index.append(i)
+                    corner_weight = corner_weight * (1. - w)
+            corner_scale = self.thicknesses[corner_index[1]] * self.lengths[corner_index[0]] ** n
+            scaled = scaled + corner_weight * grid[tuple(corner_index)] * corner_scale
+        return scaled / (thickness * length ** n)
+
+    def feasible(self, l1, l2):
+        """Feasibility mask of the table's gusset outline over L1/L2."""
+        return gusset_feasibility_mask(l1, l2, self.index['geometry'])
+
+    def lookup_all(self, l1, l2, thickness, force):
+        """Every DCR as a dict keyed like the app indicators, e.g. 'beam-moment'.
+
+        Infeasible (L1, L2) combinations come back as nan.
+        """
+        feasible = self.feasible(l1, l2)
+        dcrs = {}
+        for interface, length in (('beam', l1), ('column', l2)):
+            for check in checks:
+                dcr = self.lookup(interface, check, length, thickness, force)
+                dcrs[interface + '-' + check] = where(feasible, dcr, nan)
+        return dcrs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute a gusset design lookup table.')
+    parser.add_argument('assembly', help='filepath/to/assembly.json')
+    parser.add_argument('--force', nargs=3, type=float, required=True,
+                        metavar=('START', 'STOP', 'STEP'), help='brace force range in kips')
+    parser.add_argument('--length', nargs=3, type=float, metavar=('START', 'STOP', 'STEP'),
+                        help='L1/L2 range in inches (default: slider range)')
+    parser.add_argument('--thickness', nargs=3, type=float, metavar=('START', 'STOP', 'STEP'),
+                        help='plate thickness range in inches')
+    args = parser.parse_args()
+
+    def axis(values, default):
+        if values is None:
+            return default
+        start, stop, step = values
+        return arange(start, stop + 0.5 * step, step)
+
+    index_path = build_design_table(args.assembly,
+                                    axis(args.force, None),
+                                    lengths=axis(args.length, default_lengths),
+                                    thicknesses=axis(args.thickness, default_thicknesses))
+    print('Wrote {}'.format(index_path))
+
+
+if __name__ == '__main__':
+    main()
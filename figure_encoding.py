@@ -0,0 +1,68 @@
+"""Compact json encoding of plotly figures.
+
+Dash 1.x serializes figures through PlotlyJSONEncoder, which walks every
+coordinate in Python and writes it at full precision. Here numeric arrays
+are rounded and converted to lists in bulk with numpy instead. The result
+is still plain json, the transfer itself is shrunk by gzip (flask-compress).
+"""
+import json
+
+from numpy import around
+from numpy import asarray
+from numpy import ndarray
+
+# decimals kept for figure coordinates (inches)
+figure_precision = 4
+
+# rough json width of one array element including its separator, used to
+# estimate encoded sizes without serializing
+float_width = figure_precision + 6
+int_width = 6
+
+
+def _json_size(value):
+    return len(json.dumps(value, default=str))
+
+
+def _encode_array(value):
+    """Encode a trace or one of its properties.
+
+    Returns the json-ready value and an estimate of its encoded size in
+    bytes. Float and integer arrays (lists, tuples or ndarrays, including
+    nested ones of equal length) are converted in bulk; ragged lists, strings
+    and lists containing None are passed through unchanged.
+    """
+    if isinstance(value, dict):
+        encoded = {}
+        size = 2
+        for key, item in value.items():
+            encoded[key], item_size = _encode_array(item)
+            size += len(key) + 4 + item_size
+        return encoded, size
+    if isinstance(value, (list, tuple, ndarray)) and len(value) > 0:
+        try:
+            array = asarray(value)
+        except ValueError:
+            # ragged
+            return value, _json_size(value)
+        if array.dtype.kind == 'f':
+            return around(array, figure_precision).tolist(), array.size * float_width
+        elif array.dtype.kind in 'iu':
+            return array.tolist(), array.size * int_width
+        elif isinstance(value, ndarray):
+            value = value.tolist()
+    return value, _json_size(value)
+
+
+def encode_figure(figure):
+    """Encode a figure dict (as from Figure.to_plotly_json).
+
+    Returns the encoded figure and an estimate of its json size in bytes.
+    """
+    data = []
+    size = _json_size(figure.get('layout', {}))
+    for trace in figure.get('data', []):
+        encoded, trace_size = _encode_array(trace)
+        data.append(encoded)
+        size += trace_size
+    return {'data': data, 'layout': figure.get('layout', {})}, size
@@ -0,0 +1,118 @@
+"""Gusset plate outline geometry.
+
+Only depends on numpy, so batch and optimization tools can prune (L1, L2)
+grids without importing the Dash app. ``data`` is the gusset geometry as
+stored by the app: eb, ec, offset, design_angle, brace_depth and
+connection_length.
+"""
+from numpy import abs
+from numpy import asarray
+from numpy import broadcast_arrays
+from numpy import cos
+from numpy import errstate
+from numpy import hypot
+from numpy import isfinite
+from numpy import radians
+from numpy import sin
+from numpy import stack
+
+
+def gusset_outline_points(l1, l2, data):
+    """Vectorized gusset outline for arrays of L1/L2 values.
+
+    Mirrors the construction in update_2d_plot (pt0 ... pt6) in closed form,
+    so a whole grid of slider values can be evaluated in one call. Returns an
+    array of shape (..., 7, 2) with the outline vertices in counterclockwise
+    order; degenerate brace intersections come back as nan.
+    """
+    with errstate(divide='ignore', invalid='ignore'):
+        return _gusset_outline_points(l1, l2, data)
+
+
+def _gusset_outline_points(l1, l2, data):
+    l1, l2 = broadcast_arrays(asarray(l1, dtype=float), asarray(l2, dtype=float))
+    offset = data['offset']
+    angle = radians(data['design_angle'])
+    # brace unit vector and the left normal used by compas offset_line
+    ux, uy = sin(angle), cos(angle)
+    nx, ny = -uy, ux
+    d_column = data['brace_depth'] * 0.5 + offset
+    d_beam = -(data['brace_depth'] * 0.5 + offset)
+    x_column = data['eb'] + offset
+    y_beam = data['ec'] + offset
+    t_column = (x_column - d_column * nx) / ux + data['connection_length']
+    t_beam = (y_beam - d_beam * ny) / uy + data['connection_length']
+    if abs(t_column) > abs(t_beam):
+        t, d = t_column, d_column
+    else:
+        t, d = t_beam, -d_beam
+    pt3 = (-d * nx + t * ux, -d * ny + t * uy)
+    pt4 = (d * nx + t * ux, d * ny + t * uy)
+
+    eb, ec = data['eb'], data['ec']
+    xs = [eb + 0. * l1, eb + l1, eb + l1,
+          pt3[0] + 0. * l1, pt4[0] + 0. * l1, eb + offset + 0. * l1, eb + 0. * l1]
+    ys = [ec + 0. * l2, ec + 0. * l2, ec + offset + 0. * l2,
+          pt3[1] + 0. * l2, pt4[1] + 0. * l2, ec + l2, ec + l2]
+    return stack([stack(xs, axis=-1), stack(ys, axis=-1)], axis=-1)
+
+
+def _cross(ax, ay, bx, by):
+    return ax * by - ay * bx
+
+
+def gusset_feasibility_mask(l1, l2, data, min_edge=1.0, tol=1e-9):
+    """Boolean mask of buildable gusset outlines over arrays of L1/L2.
+
+    An outline is feasible when it is convex (pt3/pt4 do not fall inside the
+    line between pt2 and pt5), does not self-intersect, and every edge set by
+    L1, L2 or the brace cut is at least ``min_edge`` inches long. The offset
+    edges and the brace end are fixed by the assembly and are not checked.
+    """
+    with errstate(invalid='ignore'):
+        return _gusset_feasibility_mask(l1, l2, data, min_edge, tol)
+
+
+def _gusset_feasibility_mask(l1, l2, data, min_edge, tol):
+    pts = gusset_outline_points(l1, l2, data)
+    x, y = pts[..., 0], pts[..., 1]
+    n = x.shape[-1]
+    ex = [x[..., (i + 1) % n] - x[..., i] for i in range(n)]
+    ey = [y[..., (i + 1) % n] - y[..., i] for i in range(n)]
+
+    feasible = isfinite(x).all(axis=-1) & isfinite(y).all(axis=-1)
+
+    # with a zero offset pt1/pt2 and pt5/pt6 coincide
+    degenerate = [hypot(ex[i], ey[i]) <= tol for i in range(n)]
+
+    # convexity: no clockwise turns along a counterclockwise outline, turning
+    # across a zero-length edge onto the one after it
+    for i in range(n):
+        j = (i + 1) % n
+        k = (i + 2) % n
+        feasible &= _cross(ex[i], ey[i], ex[j], ey[j]) >= -tol
+        feasible &= ~degenerate[j] | (_cross(ex[i], ey[i], ex[k], ey[k]) >= -tol)
+
+    # self-intersection: non-adjacent edges must not cross or touch, except
+    # through a shared vertex or a zero-length edge
+    for i in range(n):
+        for j in range(i + 2, n):
+            if i == 0 and j == n - 1:
+                continue
+            shared = degenerate[i] | degenerate[j]
+            for a in (i, (i + 1) % n):
+                for b in (j, (j + 1) % n):
+                    shared = shared | (hypot(x[..., a] - x[..., b], y[..., a] - y[..., b]) <= tol)
+            d1 = _cross(ex[i], ey[i], x[..., j] - x[..., i], y[..., j] - y[..., i])
+            d2 = _cross(ex[i], ey[i], x[..., (j + 1) % n] - x[..., i],
+                        y[..., (j + 1) % n] - y[..., i])
+            d3 = _cross(ex[j], ey[j], x[..., i] - x[..., j], y[..., i] - y[..., j])
+            d4 = _cross(ex[j], ey[j], x[..., (i + 1) % n] - x[..., j],
+                        y[..., (i + 1) % n] - y[..., j])
+            feasible &= shared | ~((d1 * d2 <= tol) & (d3 * d4 <= tol))
+
+    # minimum length of the L1, L2 and brace-cut edges (pt0-pt1, pt2-pt3,
+    # pt4-pt5, pt6-pt0)
+    for i in (0, 2, 4, 6):
+        feasible &= hypot(ex[i], ey[i]) >= min_edge
+    return feasible
@@ -0,0 +1,119 @@
+"""Server-side per-session state, so the browser only has to hold a key.
+
+Every session's footprint is measured as the size of its pickled value.
+Sessions over the per-session limit are rejected, idle sessions expire and
+the least recently used sessions are evicted once the total limit is hit.
+Only state stored here is counted; data shared between sessions (such as
+the app's assembly cache) is accounted and limited separately.
+"""
+import os
+import pickle
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+
+
+class SessionStore(object):
+
+    def __init__(self, max_session_bytes=8 * 2 ** 20, max_total_bytes=512 * 2 ** 20,
+                 idle_timeout=3600):
+        self.max_session_bytes = max_session_bytes
+        self.max_total_bytes = max_total_bytes
+        self.idle_timeout = idle_timeout
+        self.total_bytes = 0
+        self.evictions = 0
+        # key -> [value, size in bytes, last access, version], oldest first
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environ(cls):
+        """Store configured by GUSSET_SESSION_* environment variables."""
+        kwargs = {}
+        for name, key, cast in (('max_session_bytes', 'GUSSET_SESSION_MAX_BYTES', int),
+                                ('max_total_bytes', 'GUSSET_SESSION_TOTAL_BYTES', int),
+                                ('idle_timeout', 'GUSSET_SESSION_IDLE_SECONDS', float)):
+            if key in os.environ:
+                kwargs[name] = cast(os.environ[key])
+        return cls(**kwargs)
+
+    def create(self):
+        key = uuid.uuid4().hex
+        with self._lock:
+            self._evict()
+            self._sessions[key] = [None, 0, time.time(), 0]
+        return key
+
+    def get(self, key):
+        """Session value, or None for unknown, expired or evicted keys."""
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                return None
+            now = time.time()
+            if now - session[2] > self.idle_timeout:
+                self._remove(key)
+                return None
+            session[2] = now
+            self._sessions.move_to_end(key)
+            return session[0]
+
+    def set(self, key, value):
+        """Store a value for a session and return its new version number."""
+        size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        if size > self.max_session_bytes:
+            raise ValueError('Session state of {} bytes exceeds the limit of {} bytes'.format(
+                size, self.max_session_bytes))
+        with self._lock:
+            session = self._sessions.pop(key, None)
+            if session is None:
+                session = [None, 0, 0, 0]
+            self.total_bytes += size - session[1]
+            session = [value, size, time.time(), session[3] + 1]
+            self._sessions[key] = session
+            self._evict(keep=key)
+            return session[3]
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._sessions:
+                self._remove(key)
+
+    def stats(self):
+        """Current footprint, without exposing full session keys."""
+        now = time.time()
+        with self._lock:
+            sessions = [{'session': key[:8],
+                         'bytes': session[1],
+                         'idle_seconds': round(now - session[2], 1)}
+                        for key, session in self._sessions.items()]
+            return {'sessions': len(sessions),
+                    'total_bytes': self.total_bytes,
+                    'max_session_bytes': self.max_session_bytes,
+                    'max_total_bytes': self.max_total_bytes,
+                    'idle_timeout': self.idle_timeout,
+                    'evictions': self.evictions,
+                    'by_session': sorted(sessions, key=lambda s: -s['bytes'])}
+
+    def _remove(self, key):
+        session = self._sessions.pop(key)
+        self.total_bytes -= session[1]
+
+    def _evict(self, keep=None):
+        # sessions are kept in last access order, so expired ones are at the
+        # front and the least recently used go first
+        now = time.time()
+        while self._sessions:
+            key, session = next(iter(self._sessions.items()))
+            if key == keep or now - session[2] <= self.idle_timeout:
+                break
+            self._remove(key)
+            self.evictions += 1
+        while self.total_bytes > self.max_total_bytes and self._sessions:
+            key = next(iter(self._sessions))
+            if key == keep:
+                break
+            self._remove(key)
+            self.evictions += 1
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from assembly_sections import assembly_section_hashes
+from assembly_sections import changed_sections
+
+
+@pytest.fixture
+def assembly():
+    return {'braces': [{'depth': 8.}],
+            'column': [{'depth': 14.}],
+            'beams': [{'depth': 18.}, {'depth': 21.}],
+            'units': 'in'}
+
+
+def hashes(tmp_path, assembly):
+    path = tmp_path / 'assembly.json'
+    path.write_text(json.dumps(assembly))
+    return assembly_section_hashes(str(path))
+
+
+def test_section_keys(tmp_path, assembly):
+    sections = hashes(tmp_path, assembly)
+    assert set(sections) == {'braces[0]', 'braces[]', 'column[0]', 'column[]',
+                             'beams[0]', 'beams[1]', 'beams[]', 'units'}
+    assert sections['beams[]'] == '2'
+    assert sections['beams[0]'] != sections['beams[1]']
+
+
+def test_unchanged(tmp_path, assembly):
+    old = hashes(tmp_path, assembly)
+    # key order does not matter
+    new = hashes(tmp_path, dict(reversed(list(assembly.items()))))
+    assert changed_sections(old, new) == (set(), False)
+
+
+def test_other_member_changed(tmp_path, assembly):
+    old = hashes(tmp_path, assembly)
+    assembly['beams'][1]['depth'] = 24.
+    assert changed_sections(old, hashes(tmp_path, assembly)) == ({'beams[1]'}, False)
+
+
+def test_member_added(tmp_path, assembly):
+    old = hashes(tmp_path, assembly)
+    assembly['beams'].append({'depth': 24.})
+    changed, gusset_changed = changed_sections(old, hashes(tmp_path, assembly))
+    assert changed == {'beams[2]', 'beams[]'}
+    assert not gusset_changed
+
+
+@pytest.mark.parametrize('member', ['braces', 'column', 'beams'])
+def test_gusset_member_changed(tmp_path, assembly, member):
+    old = hashes(tmp_path, assembly)
+    assembly[member][0]['depth'] += 1.
+    changed, gusset_changed = changed_sections(old, hashes(tmp_path, assembly))
+    assert changed == {member + '[0]'}
+    assert gusset_changed
+
+
+def test_non_member_changed(tmp_path, assembly):
+    old = hashes(tmp_path, assembly)
+    assembly['units'] = 'mm'
+    assert changed_sections(old, hashes(tmp_path, assembly)) == ({'units'}, True)
+    del assembly['units']
+    assert changed_sections(old, hashes(tmp_path, assembly)) == ({'units'}, True)
+
+
+def test_unknown_layout(tmp_path):
+    old = hashes(tmp_path, {'nodes': [1, 2], 'elements': [3]})
+    new = hashes(tmp_path, {'nodes': [1, 2], 'elements': [4]})
+    assert changed_sections(old, new) == ({'elements[0]'}, True)
+    assert changed_sections(new, new) == (set(), False)
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from numpy import arange
+from numpy import isnan
+
+from design_checks import DesignTable
+from design_checks import calculate_dcr
+from design_checks import checks
+from design_checks import interfaces
+from design_checks import write_design_table
+
+
+class LinearGusset(object):
+    """Gusset geometry with interface forces proportional to the brace force."""
+    eb = 7.
+    ec = 6.
+    offset = 1.
+    design_angle = 45.
+    connection_length = 12.
+
+    def get_brace_depth(self):
+        return 8.
+
+    def calculate_interface_forces(self, force):
+        return 0.3 * force, 0.2 * force, 10. * force, 0.4 * force, 0.5 * force, -8. * force
+
+
+def interface_forces(force):
+    keys = ['V_c', 'H_c', 'M_c', 'V_b', 'H_b', 'M_b']
+    return dict(zip(keys, LinearGusset().calculate_interface_forces(force)))
+
+
+@pytest.fixture
+def assembly(tmp_path):
+    path = tmp_path / 'assembly.json'
+    path.write_text(json.dumps({'braces': [], 'column': [], 'beams': []}))
+    write_design_table(str(path), LinearGusset(), arange(100., 801., 50.),
+                       arange(12, 40.5, 0.5), arange(0.5, 4.25, 0.25))
+    return str(path)
+
+
+@pytest.mark.parametrize('interface', interfaces)
+@pytest.mark.parametrize('check', checks)
+def test_lookup_between_nodes(assembly, interface, check):
+    table = DesignTable.for_assembly(assembly)
+    # 5/8" plate and a length between nodes, at an off-grid force
+    expected = calculate_dcr(interface_forces(433.), interface, check, 23.3, 0.625)
+    assert table.lookup(interface, check, 23.3, 0.625, 433.) == pytest.approx(expected, rel=1e-9)
+
+
+def test_lookup_at_nodes(assembly):
+    table = DesignTable.for_assembly(assembly)
+    expected = calculate_dcr(interface_forces(400.), 'beam', 'moment', 24., 1.)
+    assert table.lookup('beam', 'moment', 24., 1., 400.) == pytest.approx(expected, rel=1e-12)
+
+
+def test_covers(assembly):
+    table = DesignTable.for_assembly(assembly)
+    assert table.covers(24., 1., 400.)
+    assert not table.covers(24., 1., 900.)
+    assert not table.covers(10., 1., 400.)
+    assert not table.covers(24., 5., 400.)
+
+
+def test_stale_table(assembly):
+    with open(assembly, 'w') as fp:
+        json.dump({'braces': [], 'column': [], 'beams': [{}]}, fp)
+    assert DesignTable.for_assembly(assembly) is None
+
+
+def test_lookup_all_masks_infeasible(assembly):
+    table = DesignTable.for_assembly(assembly)
+    feasible = table.lookup_all(24., 24., 1., 400.)
+    infeasible = table.lookup_all(16., 24., 1., 400.)
+    assert not any(isnan(value) for value in feasible.values())
+    assert all(isnan(value) for value in infeasible.values())
+
+
+def test_rebuild_while_open(assembly, tmp_path):
+    table = DesignTable.for_assembly(assembly)
+    before = table.lookup('beam', 'moment', 24., 1., 400.)
+    write_design_table(assembly, LinearGusset(), arange(100., 1001., 100.),
+                       arange(12, 40.5, 1.), arange(0.5, 4.25, 0.5))
+    # the open table keeps mapping the old data, new ones see the new table
+    assert table.lookup('beam', 'moment', 24., 1., 400.) == before
+    assert float(table.table.sum()) > 0.
+    assert DesignTable.for_assembly(assembly).covers(24., 1., 900.)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        'assembly.dcr.json', 'assembly.dcr.npy', 'assembly.json']
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from numpy import arange
+from numpy import array
+
+from figure_encoding import _encode_array
+from figure_encoding import encode_figure
+
+
+@pytest.mark.parametrize('value', [[1.23456789, 2.5, -3.000049],
+                                   (1.23456789, 2.5, -3.000049),
+                                   array([1.23456789, 2.5, -3.000049])])
+def test_float_array(value):
+    encoded, size = _encode_array(value)
+    assert encoded == [1.2346, 2.5, -3.0]
+    assert all(type(x) is float for x in encoded)
+    assert size > 0
+
+
+@pytest.mark.parametrize('value', [[0, 1, 2], array([0, 1, 2], dtype='int64'),
+                                   array([0, 1, 2], dtype='uint8')])
+def test_int_array(value):
+    encoded, _ = _encode_array(value)
+    assert encoded == [0, 1, 2]
+    assert all(type(x) is int for x in encoded)
+
+
+def test_nested_array():
+    encoded, _ = _encode_array([[0.123456, 1], [2, 3]])
+    assert encoded == [[0.1235, 1.], [2., 3.]]
+
+
+@pytest.mark.parametrize('value', [[[1., 2.], [3.]],
+                                   ['a', 'bc'],
+                                   [1., None, 2.],
+                                   [],
+                                   'markers',
+                                   None,
+                                   True,
+                                   2.123456789])
+def test_passed_through(value):
+    encoded, size = _encode_array(value)
+    assert encoded == value
+    assert size == len(json.dumps(value))
+
+
+def test_object_ndarray():
+    encoded, _ = _encode_array(array(['a', None], dtype=object))
+    assert encoded == ['a', None]
+
+
+def test_nested_dict():
+    trace = {'type': 'scatter3d',
+             'x': array([0.123456, 1.]),
+             'marker': {'color': ['red', 'blue'], 'size': [1, 2],
+                        'line': {'width': 0.55555}},
+             'text': None}
+    encoded, _ = _encode_array(trace)
+    assert encoded == {'type': 'scatter3d',
+                       'x': [0.1235, 1.],
+                       'marker': {'color': ['red', 'blue'], 'size': [1, 2],
+                                  'line': {'width': 0.55555}},
+                       'text': None}
+
+
+def test_figure_size_estimate():
+    figure = {'data': [{'type': 'mesh3d', 'x': arange(1000) / 7., 'y': arange(1000) / 3.,
+                        'i': arange(1000), 'name': 'beam'}],
+              'layout': {'height': 620}}
+    encoded, size = encode_figure(figure)
+    actual = len(json.dumps(encoded))
+    assert encoded['layout'] == {'height': 620}
+    assert 0.5 * actual < size < 2 * actual
@@ -0,0 +1,76 @@
+import warnings
+
+import pytest
+
+from numpy import allclose
+from numpy import arange
+from numpy import meshgrid
+
+from gusset_geometry import gusset_feasibility_mask
+from gusset_geometry import gusset_outline_points
+
+
+@pytest.fixture
+def data():
+    return {'eb': 7., 'ec': 6., 'offset': 1., 'design_angle': 45.,
+            'brace_depth': 8., 'connection_length': 12.}
+
+
+def test_outline_points(data):
+    pts = gusset_outline_points(24, 24, data)
+    assert pts.shape == (7, 2)
+    assert allclose(pts[0], [7., 6.])
+    assert allclose(pts[1], [31., 6.])
+    assert allclose(pts[2], [31., 7.])
+    assert allclose(pts[5], [8., 30.])
+    assert allclose(pts[6], [7., 30.])
+    # brace cut is symmetric about the brace centerline at 45 degrees
+    assert allclose(pts[3], pts[4][::-1])
+
+
+def test_feasible_outline(data):
+    assert gusset_feasibility_mask(24, 24, data)
+
+
+def test_concave_outline(data):
+    # pt2 inside the brace cut, and pt2 far enough out that pt3 caves in
+    assert not gusset_feasibility_mask(16, 24, data)
+    assert not gusset_feasibility_mask(32, 24, data)
+
+
+def test_minimum_edge_length(data):
+    assert gusset_feasibility_mask(24, 24, data, min_edge=1.)
+    assert not gusset_feasibility_mask(24, 24, data, min_edge=30.)
+
+
+def test_grid_shape(data):
+    l1, l2 = meshgrid(arange(12, 40.5, 0.5), arange(12, 40.5, 0.5))
+    mask = gusset_feasibility_mask(l1, l2, data)
+    assert mask.shape == l1.shape
+    assert mask.any() and not mask.all()
+    assert mask[(l2 == 24) & (l1 == 24)].all()
+
+
+def test_zero_offset(data):
+    data['offset'] = 0.
+    pts = gusset_outline_points(20, 20, data)
+    assert allclose(pts[1], pts[2])
+    assert allclose(pts[5], pts[6])
+    assert gusset_feasibility_mask(20, 20, data)
+    l1, l2 = meshgrid(arange(12, 40.5, 0.5), arange(12, 40.5, 0.5))
+    assert gusset_feasibility_mask(l1, l2, data).any()
+
+
+def test_zero_offset_concave(data):
+    # pt1 far enough out that the outline caves in at pt3
+    data['offset'] = 0.
+    assert not gusset_feasibility_mask(36, 20, data)
+
+
+@pytest.mark.parametrize('angle', [0., 90.])
+def test_degenerate_brace_angle(data, angle):
+    data['design_angle'] = angle
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        mask = gusset_feasibility_mask(arange(12, 40.5, 4), 24, data)
+    assert not mask.any()
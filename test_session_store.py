@@ -0,0 +1,78 @@
+import pickle
+import time
+
+import pytest
+
+from session_store import SessionStore
+
+
+def test_set_and_get():
+    store = SessionStore()
+    key = store.create()
+    assert store.get(key) is None
+    assert store.set(key, {'force': 400.}) == 1
+    assert store.set(key, {'force': 500.}) == 2
+    assert store.get(key) == {'force': 500.}
+    assert store.get('unknown') is None
+
+
+def test_session_limit():
+    store = SessionStore(max_session_bytes=100)
+    key = store.create()
+    with pytest.raises(ValueError):
+        store.set(key, 'x' * 200)
+    assert store.stats()['total_bytes'] == 0
+
+
+def test_accounting():
+    store = SessionStore()
+    a, b = store.create(), store.create()
+    store.set(a, 'a' * 1000)
+    store.set(b, 'b' * 500)
+    total = store.stats()['total_bytes']
+    assert total > 1500
+    store.set(a, 'a' * 600)
+    assert store.stats()['total_bytes'] == total - 400
+    store.delete(b)
+    stats = store.stats()
+    assert stats['sessions'] == 1
+    assert stats['by_session'][0]['session'] == a[:8]
+
+
+def test_least_recently_used_eviction():
+    store = SessionStore(max_total_bytes=1500)
+    a, b, c = store.create(), store.create(), store.create()
+    store.set(a, 'a' * 600)
+    store.set(b, 'b' * 600)
+    store.get(a)
+    store.set(c, 'c' * 600)
+    assert store.get(b) is None
+    assert store.get(a) is not None
+    assert store.get(c) is not None
+    assert store.stats()['evictions'] == 1
+
+
+def test_idle_eviction():
+    store = SessionStore(idle_timeout=0.05)
+    a = store.create()
+    store.set(a, 'a')
+    time.sleep(0.1)
+    store.create()
+    assert store.stats()['sessions'] == 1
+    assert store.get(a) is None
+
+
+def test_many_sessions():
+    store = SessionStore(max_total_bytes=10000)
+    size = len(pickle.dumps(0, pickle.HIGHEST_PROTOCOL))
+    keys = []
+    for i in range(16000):
+        keys.append(store.create())
+        store.set(keys[-1], 0)
+    stats = store.stats()
+    assert stats['total_bytes'] <= 10000
+    assert stats['total_bytes'] == stats['sessions'] * size
+    assert stats['sessions'] + store.evictions == len(keys)
+    # the most recently set sessions are the ones kept
+    assert all(store.get(key) == 0 for key in keys[-stats['sessions']:])
+    assert store.get(keys[0]) is None
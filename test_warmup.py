@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+
+from warmup import default_force
+from warmup import merge_usage
+from warmup import neighbour_assemblies
+from warmup import parse_warmup_entry
+from warmup import write_usage_file
+
+
+def test_parse_warmup_entry(tmp_path):
+    path = str(tmp_path / 'assembly.json')
+    assert parse_warmup_entry(path) == (path, default_force)
+    assert parse_warmup_entry(path + '@250') == (path, 250.)
+    assert parse_warmup_entry(path + '@-1.5e2') == (path, -150.)
+
+
+def test_parse_warmup_entry_relative():
+    assert parse_warmup_entry('assembly.json@300') == (os.path.abspath('assembly.json'), 300.)
+
+
+def test_parse_warmup_entry_at_in_path(tmp_path):
+    path = tmp_path / 'project@2' / 'assembly.json'
+    path.parent.mkdir()
+    path.write_text('{}')
+    assert parse_warmup_entry(str(path)) == (str(path), default_force)
+    assert parse_warmup_entry(str(path) + '@300') == (str(path), 300.)
+
+
+def test_parse_warmup_entry_invalid(tmp_path):
+    with pytest.raises(ValueError):
+        parse_warmup_entry(str(tmp_path / 'assembly.json@heavy'))
+
+
+def test_neighbour_assemblies(tmp_path):
+    for name in ['a.json', 'b.json', 'c.json', 'd.json', 'e.json', 'f.json',
+                 'c.dcr.json', '.hidden.json', 'notes.txt']:
+        (tmp_path / name).write_text('{}')
+    nearest = neighbour_assemblies(str(tmp_path / 'c.json'))
+    assert [os.path.basename(path) for path in nearest] == [
+        'd.json', 'b.json', 'e.json', 'a.json', 'f.json']
+    assert all(os.path.dirname(path) == str(tmp_path) for path in nearest)
+
+
+def test_neighbour_assemblies_ends(tmp_path):
+    for name in ['a.json', 'b.json', 'c.json']:
+        (tmp_path / name).write_text('{}')
+    first = neighbour_assemblies(str(tmp_path / 'a.json'))
+    last = neighbour_assemblies(str(tmp_path / 'c.json'))
+    assert [os.path.basename(path) for path in first] == ['b.json', 'c.json']
+    assert [os.path.basename(path) for path in last] == ['b.json', 'a.json']
+
+
+def test_neighbour_assemblies_missing_directory(tmp_path):
+    assert neighbour_assemblies(str(tmp_path / 'missing' / 'a.json')) == []
+
+
+def test_merge_usage():
+    usage = {'/a.json': {'count': 3, 'force': 400.}, '/b.json': {'count': 1, 'force': 200.}}
+    pending = {'/a.json': {'count': 2, 'force': 500.}, '/c.json': {'count': 1, 'force': 100.}}
+    assert merge_usage(usage, pending) is usage
+    assert usage == {'/a.json': {'count': 5, 'force': 500.},
+                     '/b.json': {'count': 1, 'force': 200.},
+                     '/c.json': {'count': 1, 'force': 100.}}
+    assert pending['/a.json'] == {'count': 2, 'force': 500.}
+
+
+def test_write_usage_file(tmp_path):
+    path = str(tmp_path / 'usage.json')
+    write_usage_file(path, {'/a.json': {'count': 1, 'force': 400.}})
+    # a second process merging into what the first wrote
+    with open(path) as fp:
+        usage = merge_usage(json.load(fp), {'/a.json': {'count': 2, 'force': 300.}})
+    write_usage_file(path, usage)
+    with open(path) as fp:
+        assert json.load(fp) == {'/a.json': {'count': 3, 'force': 300.}}
+    assert os.listdir(str(tmp_path)) == ['usage.json']
@@ -0,0 +1,74 @@
+"""Assembly usage counts and the choice of assemblies to evaluate ahead of use.
+
+The usage file maps absolute assembly filepaths to {'count': n, 'force':
+kips}, the number of submissions and the last brace force used.
+"""
+import bisect
+import json
+import os
+import tempfile
+
+# brace force used for assemblies that were never submitted
+default_force = 400.0
+
+
+def parse_warmup_entry(item):
+    """Split a GUSSET_WARMUP entry into an absolute filepath and brace force."""
+    filepath, sep, force = item.rpartition('@')
+    if not sep:
+        return os.path.abspath(item), default_force
+    try:
+        return os.path.abspath(filepath), float(force)
+    except ValueError:
+        if os.path.exists(item):
+            # the '@' belongs to the path
+            return os.path.abspath(item), default_force
+        raise ValueError('Invalid warm-up entry: {}'.format(item))
+
+
+def neighbour_assemblies(filepath):
+    """Other assembly files in filepath's directory, nearest by name first.
+
+    Files are taken alternately after and before filepath in sorted order.
+    """
+    directory, name = os.path.split(filepath)
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return []
+    names = [other for other in names
+             if other.endswith('.json') and not other.endswith('.dcr.json') and
+             not other.startswith('.') and other != name]
+    position = bisect.bisect_left(names, name)
+    after = names[position:]
+    before = names[:position][::-1]
+    nearest = []
+    for i in range(max(len(after), len(before))):
+        if i < len(after):
+            nearest.append(os.path.join(directory, after[i]))
+        if i < len(before):
+            nearest.append(os.path.join(directory, before[i]))
+    return nearest
+
+
+def merge_usage(usage, pending):
+    """Add pending uses to usage counts in place; the latest force wins."""
+    for filepath, used in pending.items():
+        merged = usage.setdefault(filepath, {'count': 0})
+        merged['count'] += used['count']
+        merged['force'] = used['force']
+    return usage
+
+
+def write_usage_file(path, usage):
+    """Replace the usage file atomically, so readers never see a partial write."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as fp:
+            json.dump(usage, fp, indent=2)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise